@@ -1,22 +1,46 @@
 # app/main.py
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from app.routers import stocks
 
-app = FastAPI()
 
-origins = [
-    "http://localhost:3000",
-    "http://127.0.0.1:3000",
-    "http://192.168.0.53:3000",  # 👈 지금 접속하는 주소
-]
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 동기 라우트 / run_in_threadpool 작업이 공유하는 스레드풀 크기 (기본 40)
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 64
+    # 심볼 CSV(국장/미장 병렬 로딩) + 검색 인덱스를 미리 만들어 두고 라우터는 app.state 에서 사용
+    app.state.symbol_index = await stocks.load_symbol_index()
+    yield
+
+
+def create_app() -> FastAPI:
+    # 응답 JSON 직렬화는 orjson 사용 (대용량 OHLCV 배열에서 stdlib json 보다 빠름)
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+    origins = [
+        "http://localhost:3000",
+        "http://127.0.0.1:3000",
+        "http://192.168.0.53:3000",  # 👈 지금 접속하는 주소
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,   # 개발 중에는 ["*"]로 풀어도 됨
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # OHLCV 같은 큰 JSON 응답 압축 (반복 키/비슷한 숫자라 압축률이 높음)
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+    app.include_router(stocks.router, prefix="/api")
+    return app
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,   # 개발 중에는 ["*"]로 풀어도 됨
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(stocks.router, prefix="/api")
\ No newline at end of file
+app = create_app()
@@ -1,13 +1,30 @@
 # app/routers/stocks.py
+import asyncio
+import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from threading import Lock
+from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
-from fastapi import APIRouter, HTTPException, Query
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
+from app.services import market_data
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:  # numba 가 없으면 pandas resample 로 집계
+    HAS_NUMBA = False
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/stocks", tags=["stocks"])
 
 # === CSV 로딩 (국장 + 미장 심볼, 검색용) ===
@@ -17,16 +34,95 @@ DATA_DIR = BASE_DIR / "data"
 KR_PATH = DATA_DIR / "stocks_kr.csv"
 US_PATH = DATA_DIR / "stocks_us.csv"
 
-try:
-    KR = pd.read_csv(KR_PATH, dtype={"symbol": str})
-    US = pd.read_csv(US_PATH, dtype={"symbol": str})
-    ALL = pd.concat([KR, US], ignore_index=True)
-    print(
-        f"[stocks] 심볼 CSV 로딩 완료: KR={len(KR)}, US={len(US)}, ALL={len(ALL)}"
-    )
-except Exception as e:
-    print("[stocks] 심볼 CSV 로딩 오류:", e)
-    ALL = pd.DataFrame(columns=["symbol", "name", "market"])
+
+def _read_symbols(csv_path: Path) -> pd.DataFrame:
+    """
+    같은 이름의 parquet(scripts/update_symbols*.py 또는 csv_to_parquet.py 가 생성)이
+    CSV 보다 최신이면 우선 사용 (CSV 파싱보다 빠름), 아니면 CSV
+    → git pull 로 CSV 만 갱신된 경우 예전 parquet 이 쓰이지 않도록 수정 시각 비교
+    """
+    parquet_path = csv_path.with_suffix(".parquet")
+    if parquet_path.exists() and parquet_path.stat().st_mtime >= csv_path.stat().st_mtime:
+        return pd.read_parquet(parquet_path, engine="pyarrow").astype(
+            {"symbol": "string[pyarrow]", "name": "string[pyarrow]"}
+        )
+    return pd.read_csv(csv_path, dtype={"symbol": str})
+
+
+SEARCH_LIMIT = 20
+
+
+class SymbolIndex:
+    """
+    검색용 심볼 테이블 + 인덱스 (로딩 시 한 번만 소문자화/정렬)
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+        # 검색 대상: 소문자 고정폭 문자열 배열 → np.char.find 로 C 레벨 부분 일치
+        self.name_lower = self._text_column("name").str.lower().to_numpy(dtype=str)
+        self.symbol_lower = self._text_column("symbol").str.lower().to_numpy(dtype=str)
+
+        # 접두어 검색용: name + symbol 을 정렬해 두고 이진 탐색 (자동완성은 대부분 접두어 입력)
+        keys = np.concatenate([self.name_lower, self.symbol_lower])
+        rows = np.concatenate([np.arange(len(df)), np.arange(len(df))])
+        order = np.argsort(keys, kind="stable")
+        self.prefix_keys, self.prefix_rows = keys[order], rows[order]
+
+        # 결과 생성용 원본 값
+        self.symbols = self._text_column("symbol").to_numpy()
+        self.names = self._text_column("name").to_numpy()
+        self.markets = self._text_column("market").replace("", "UNKNOWN").to_numpy()
+
+    def _text_column(self, col: str) -> pd.Series:
+        # 결측값은 빈 문자열로 (category / arrow string 컬럼 모두 동일하게 처리)
+        return self.df[col].astype(object).fillna("").astype(str).str.strip()
+
+    @property
+    def empty(self) -> bool:
+        return self.df.empty
+
+    def search(self, ql: str, limit: int = SEARCH_LIMIT) -> np.ndarray:
+        """
+        검색어(소문자)와 일치하는 행 번호.
+        접두어 일치를 먼저(정렬 배열 이진 탐색, O(log N + 결과 수)) 채우고,
+        limit 에 못 미치면 부분 일치 전체 스캔으로 나머지를 채움
+        """
+        lo = np.searchsorted(self.prefix_keys, ql, side="left")
+        hi = np.searchsorted(self.prefix_keys, ql + "\U0010ffff", side="left")
+        # 같은 행이 name/symbol 양쪽에서 잡힐 수 있으므로 unique (행 순서 유지)
+        idx = np.unique(self.prefix_rows[lo:hi])[:limit]
+        if len(idx) >= limit:
+            return idx
+
+        rest = self._substring_rows(ql, limit + len(idx))
+        rest = rest[~np.isin(rest, idx)][:limit - len(idx)]
+        return np.concatenate([idx, rest])
+
+    def _substring_rows(self, ql: str, limit: int) -> np.ndarray:
+        mask = (np.char.find(self.name_lower, ql) >= 0) | (np.char.find(self.symbol_lower, ql) >= 0)
+        return np.flatnonzero(mask)[:limit]
+
+
+async def load_symbol_index() -> SymbolIndex:
+    """
+    국장/미장 심볼 파일을 병렬로 읽어 검색 인덱스 생성. 앱 시작(lifespan) 시 한 번 호출해 app.state 에 보관
+    """
+    try:
+        kr, us = await asyncio.gather(
+            asyncio.to_thread(_read_symbols, KR_PATH),
+            asyncio.to_thread(_read_symbols, US_PATH),
+        )
+        df = pd.concat([kr, us], ignore_index=True)
+        # market 은 몇 개 안 되는 값의 반복 → category 로 메모리 절약
+        df["market"] = df["market"].astype("category")
+        logger.info("심볼 CSV 로딩 완료: KR=%d, US=%d, ALL=%d", len(kr), len(us), len(df))
+    except Exception as e:
+        logger.error("심볼 CSV 로딩 오류: %s", e)
+        df = pd.DataFrame(columns=["symbol", "name", "market"])
+
+    return await asyncio.to_thread(SymbolIndex, df)
 
 
 # =======================
@@ -39,36 +135,28 @@ class StockItem(BaseModel):
 
 
 @router.get("/search", response_model=List[StockItem])
-async def search_stocks(q: str = Query(..., min_length=1)):
+def search_stocks(request: Request, q: str = Query(..., min_length=1)):
     """
     종목명(name) / 티커(symbol) 부분 일치 검색
+    (pandas 연산이라 동기 함수로 두고 FastAPI 스레드풀에서 실행)
     """
     try:
         q = q.strip()
         if not q:
             return []
 
-        if ALL.empty:
-            print("[stocks] ALL 데이터프레임이 비어 있음")
+        index: SymbolIndex | None = getattr(request.app.state, "symbol_index", None)
+        if index is None or index.empty:
+            logger.warning("ALL 데이터프레임이 비어 있음")
             return []
 
-        df = ALL[
-            ALL["name"].astype(str).str.contains(q, case=False, na=False)
-            | ALL["symbol"].astype(str).str.contains(q, case=False, na=False)
-            ].head(20)
-
-        items: List[StockItem] = []
-        for _, row in df.iterrows():
-            sym = str(row.get("symbol", "")).strip()
-            nm = str(row.get("name", "")).strip()
-            mk = str(row.get("market", "")).strip() or "UNKNOWN"
-
-            items.append(StockItem(symbol=sym, name=nm, market=mk))
-
-        return items
+        return [
+            StockItem(symbol=index.symbols[i], name=index.names[i], market=index.markets[i])
+            for i in index.search(q.lower())
+        ]
 
     except Exception as e:
-        print("[stocks] search_stocks 오류:", e)
+        logger.exception("search_stocks 오류: %s", e)
         raise HTTPException(status_code=500, detail="검색 중 오류가 발생했습니다.")
 
 
@@ -87,47 +175,123 @@ class Candle(BaseModel):
 # =======================
 #   yfinance 헬퍼 함수
 # =======================
+_PERIOD_DELTA = {
+    "1mo": timedelta(days=30),
+    "3mo": timedelta(days=90),
+    "1y": timedelta(days=365),
+}
+_DEFAULT_PERIOD_DELTA = timedelta(days=180)  # 기본값 6개월
+
+
 def _get_period_range(period: str) -> tuple[datetime, datetime]:
     now = datetime.utcnow()
+    return now - _PERIOD_DELTA.get(period, _DEFAULT_PERIOD_DELTA), now
 
-    if period == "1mo":
-        start = now - timedelta(days=30)
-    elif period == "3mo":
-        start = now - timedelta(days=90)
-    elif period == "1y":
-        start = now - timedelta(days=365)
-    else:  # 기본값 6개월
-        start = now - timedelta(days=180)
 
-    return start, now
+# =======================
+#   타임프레임 설정
+# =======================
+# 일봉 이력을 한 번만 받아오고 주/월/년봉은 로컬에서 resample (tf마다 따로 요청하지 않음)
+# resample 라벨은 yfinance 주봉/월봉과 같이 구간 시작일(월요일 / 1일)
+_RESAMPLE_RULE_BY_TF = {
+    "D": None,
+    "W": "W-MON",
+    "M": "MS",
+    "Y": "YS",
+}
+_PERIOD_BY_TF = {
+    "D": timedelta(days=180),       # 일봉 6개월
+    "W": timedelta(days=365 * 3),   # 주봉 3년치
+    "M": timedelta(days=365 * 10),  # 월봉 10년치
+    "Y": timedelta(days=365 * 30),  # 년봉 30년치
+}
+# 일봉 이력은 market_data.HISTORY_SPAN(30년) 만큼 받아 두므로 가장 긴 기간도 이 안에 들어와야 함
 
 
-def _fetch_candles_yfinance(symbol: str, start: datetime, end: datetime, interval: str, tf: str) -> List[Candle]:
+@lru_cache(maxsize=8)
+def _normalize_tf(tf: str) -> str:
     """
-    yfinance에서 캔들 가져오기 + tf에 따라 필요한 경우(년봉) 집계
+    프론트에서 오는 tf(D/W/M/Y) 정규화 (모르는 tf는 일봉)
     """
-    try:
-        print(f"[stocks] yfinance history: {symbol}, {start.date()}~{end.date()}, interval={interval}, tf={tf}")
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(
-            start=start.date(),
-            end=end.date(),
-            interval=interval,
-        )
-    except Exception as e:
-        print("[stocks] yfinance history 오류:", e)
-        raise HTTPException(status_code=502, detail="시세 조회에 실패했습니다.")
+    tf = (tf or "D").upper()
+    return tf if tf in _PERIOD_BY_TF else "D"
 
-    if df.empty:
-        print("[stocks] yfinance 결과가 비어 있음:", symbol)
-        raise HTTPException(status_code=404, detail="해당 종목의 시세 데이터를 찾을 수 없습니다.")
 
-    tf = tf.upper()
+# =======================
+#   yfinance 캐시
+# =======================
+# tf별 TTL(초): 일봉은 장중 갱신이 잦으니 짧게, 주/월/년봉은 길게
+_CACHE_TTL_BY_TF = {
+    "D": 60,
+    "W": 600,
+    "M": 3600,
+    "Y": 3600,
+}
+
+# tf별 최종 캔들 리스트 캐시 (원본 일봉 이력 캐시는 services/market_data.py)
+_CANDLE_CACHE = {tf: TTLCache(maxsize=512, ttl=ttl) for tf, ttl in _CACHE_TTL_BY_TF.items()}
+_cache_lock = Lock()
+
+
+def _cache_control(tf: str) -> str:
+    # 서버 캐시와 같은 TTL 로 브라우저/프록시 캐시 허용
+    return f"public, max-age={_CACHE_TTL_BY_TF[tf]}"
+
+
+_PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+
 
-    # ✅ 년봉: 월봉 데이터를 연단위로 집계
-    if tf == "Y":
-        # index가 DatetimeIndex라고 가정
-        df = df.resample("Y").agg(
+def _group_ohlcv_py(keys, o, h, l, c, v):
+    """
+    정렬된 일봉을 같은 key(구간 시작일) 끼리 한 번의 순회로 집계
+    → (각 구간 첫 행 위치, [open, high, low, close, volume] 배열)
+    """
+    n = keys.size
+    starts = np.empty(n, np.int64)
+    out = np.empty((n, 5))
+    g = -1
+    for i in range(n):
+        if g < 0 or keys[i] != keys[i - 1]:
+            g += 1
+            starts[g] = i
+            out[g, 0] = o[i]
+            out[g, 1] = h[i]
+            out[g, 2] = l[i]
+            out[g, 3] = c[i]
+            out[g, 4] = v[i]
+        else:
+            out[g, 1] = max(out[g, 1], h[i])
+            out[g, 2] = min(out[g, 2], l[i])
+            out[g, 3] = c[i]
+            out[g, 4] += v[i]
+    return starts[:g + 1], out[:g + 1]
+
+
+if HAS_NUMBA:
+    _group_ohlcv = njit(cache=True)(_group_ohlcv_py)
+
+
+def _bucket_labels(index: pd.DatetimeIndex, tf: str) -> np.ndarray:
+    """
+    일봉 날짜 → 해당 주(월요일) / 월(1일) / 년(1월 1일) 시작일 (datetime64[D])
+    """
+    # tz 가 있으면 거래소 현지 날짜 기준
+    days = (index.tz_localize(None) if index.tz is not None else index).to_numpy().astype("datetime64[D]")
+    if tf == "W":
+        d = days.astype(np.int64)
+        return (d - (d + 3) % 7).astype("datetime64[D]")  # 1970-01-01 은 목요일
+    if tf == "M":
+        return days.astype("datetime64[M]").astype("datetime64[D]")
+    return days.astype("datetime64[Y]").astype("datetime64[D]")
+
+
+def _resample_ohlcv(df: pd.DataFrame, tf: str) -> pd.DataFrame:
+    """
+    일봉 → 주/월/년봉 집계. numba 가 있으면 JIT 단일 패스, 없으면 pandas resample
+    """
+    if not HAS_NUMBA:
+        # resample 은 거래가 없는 주/월/년(연휴 등)도 빈 구간으로 만들므로, numba 경로와 같게 제거
+        return df.resample(_RESAMPLE_RULE_BY_TF[tf], label="left", closed="left").agg(
             {
                 "Open": "first",
                 "High": "max",
@@ -135,56 +299,144 @@ def _fetch_candles_yfinance(symbol: str, start: datetime, end: datetime, interva
                 "Close": "last",
                 "Volume": "sum",
             }
-        )
+        ).dropna(subset=_PRICE_COLUMNS)
+
+    labels = _bucket_labels(df.index, tf)
+    starts, out = _group_ohlcv(
+        labels.astype(np.int64),
+        df["Open"].to_numpy(np.float64),
+        df["High"].to_numpy(np.float64),
+        df["Low"].to_numpy(np.float64),
+        df["Close"].to_numpy(np.float64),
+        df["Volume"].fillna(0.0).to_numpy(np.float64),
+    )
+    return pd.DataFrame(
+        out,
+        index=pd.DatetimeIndex(labels[starts]),
+        columns=["Open", "High", "Low", "Close", "Volume"],
+    )
+
+
+# 전송용 가격 유효숫자 (float32 수준 정밀도). 소수 자릿수 고정이 아니라 유효숫자 기준이라
+# 0.00004 같은 OTC 초저가 종목도 0 으로 뭉개지지 않음
+_WIRE_SIG_DIGITS = 7
+_WIRE_PRICE_COLUMNS = ["open", "high", "low", "close"]
+
+
+def _round_sig(values: np.ndarray, digits: int = _WIRE_SIG_DIGITS) -> np.ndarray:
+    """
+    값마다 크기(10의 지수)에 맞춰 유효숫자 digits 자리로 반올림 (0 / NaN 은 그대로)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        exponent = np.floor(np.log10(np.abs(values)))
+    exponent = np.where(np.isfinite(exponent), exponent, 0.0)
+    scale = 10.0 ** (digits - 1 - exponent)
+    return np.round(values * scale) / scale
+
+
+def _to_candles(df: pd.DataFrame, tf: str) -> List[Dict[str, Any]]:
+    """
+    일봉 DataFrame → tf 기간만큼 잘라서 집계한 캔들 dict 리스트 (Candle 스키마와 동일한 키)
+    """
+    # index가 DatetimeIndex라고 가정
+    start = pd.Timestamp(datetime.utcnow() - _PERIOD_BY_TF[tf]).normalize()
+    if df.index.tz is not None:
+        start = start.tz_localize(df.index.tz)
+    df = df[df.index >= start]
+
+    # 가격이 비어 있는 행(휴장일 등)은 행별 예외 처리 대신 한 번에 제거
+    df = df.dropna(subset=_PRICE_COLUMNS)
 
-    candles: List[Candle] = []
-    for idx, row in df.iterrows():
+    # ✅ 주/월/년봉: 일봉을 구간별로 집계
+    if _RESAMPLE_RULE_BY_TF[tf] is not None:
+        df = _resample_ohlcv(df, tf)
+
+    # iterrows + 행별 Candle 생성 대신 한 번에 records 변환
+    ohlcv = df.rename(columns=str.lower)[["open", "high", "low", "close", "volume"]]
+    # 수정주가는 187.23456789012 처럼 자릿수가 길게 나오므로 전송용으로 반올림 (가격 유효숫자 7자리, 거래량 정수)
+    ohlcv = ohlcv.assign(volume=ohlcv["volume"].fillna(0.0).round(0))
+    ohlcv[_WIRE_PRICE_COLUMNS] = _round_sig(ohlcv[_WIRE_PRICE_COLUMNS].to_numpy(np.float64))
+    times = df.index.strftime("%Y-%m-%d").to_numpy()
+    return [
+        {"time": t, **rec}
+        for t, rec in zip(times, ohlcv.to_dict(orient="records"))
+    ]
+
+
+def _fetch_candles_bulk(symbols: List[str], tf: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    여러 심볼의 캔들을 한 번에 조회 (캐시 hit 심볼은 네트워크 요청 없이 재사용)
+    """
+    cache = _CANDLE_CACHE[tf]
+    result: Dict[str, List[Dict[str, Any]]] = {}
+    missing: List[str] = []
+    with _cache_lock:
+        for sym in symbols:
+            candles = cache.get(sym)
+            if candles is None:
+                missing.append(sym)
+            else:
+                result[sym] = candles
+
+    if missing:
         try:
-            dt = idx.date().isoformat()
-            candles.append(
-                Candle(
-                    time=dt,
-                    open=float(row["Open"]),
-                    high=float(row["High"]),
-                    low=float(row["Low"]),
-                    close=float(row["Close"]),
-                    volume=float(row.get("Volume") or 0.0),
-                )
-            )
-        except Exception as e:
-            print("[stocks] yfinance 캔들 변환 오류:", e)
-            continue
+            histories = market_data.get_histories(missing)
+        except market_data.MarketDataError as e:
+            logger.error("%s", e)
+            raise HTTPException(status_code=502, detail="시세 조회에 실패했습니다.")
 
-    if not candles:
-        raise HTTPException(status_code=404, detail="캔들 데이터가 비어 있습니다.")
+        for sym, df in histories.items():
+            candles = _to_candles(df, tf)
+            if not candles:
+                continue
+            result[sym] = candles
+            with _cache_lock:
+                cache[sym] = candles
 
-    return candles
-# 타임프레임별 기간 + interval
-def _get_range_and_interval(tf: str) -> tuple[datetime, datetime, str]:
+    return result
+
+
+def _fetch_candles_yfinance(symbol: str, tf: str) -> List[Dict[str, Any]]:
     """
-    프론트에서 오는 tf(D/W/M/Y)에 따라 기간 + yfinance interval 결정
+    단일 심볼 캔들 조회 (bulk 경로의 얇은 래퍼)
     """
-    now = datetime.utcnow()
-    tf = (tf or "D").upper()
+    candles = _fetch_candles_bulk([symbol], tf).get(symbol)
+    if not candles:
+        logger.debug("yfinance 결과가 비어 있음: %s", symbol)
+        raise HTTPException(status_code=404, detail="해당 종목의 시세 데이터를 찾을 수 없습니다.")
+
+    return candles
+
 
-    if tf == "W":      # 주봉: 3년치
-        start = now - timedelta(days=365 * 3)
-        interval = "1wk"
-    elif tf == "M":    # 월봉: 10년치
-        start = now - timedelta(days=365 * 10)
-        interval = "1mo"
-    elif tf == "Y":    # 년봉: 30년치 (월봉 받아서 연단위로 묶을거라 1mo 사용)
-        start = now - timedelta(days=365 * 30)
-        interval = "1mo"
-    else:              # 기본: 일봉 6개월
-        start = now - timedelta(days=180)
-        interval = "1d"
-
-    return start, now, interval
 # =======================
 #   캔들 API 엔드포인트
 # =======================
-@router.get("/{symbol}/ohlcv", response_model=List[Candle])
+# bulk 한 요청에서 조회할 수 있는 최대 심볼 수 (과도한 다운로드 / 이력 캐시 밀어내기 방지)
+BULK_MAX_SYMBOLS = 50
+
+# 캔들 응답은 이미 스키마대로 만든 dict 이므로 response_model 재검증 없이 바로 직렬화 (문서용 스키마만 명시)
+@router.get("/ohlcv/bulk", response_model=None, responses={200: {"model": Dict[str, List[Candle]]}})
+async def get_ohlcv_bulk(
+        symbols: str = Query(..., min_length=1, description="쉼표로 구분된 심볼 목록 (예: AAPL,MSFT,005930.KS)"),
+        tf: str = Query("D", description="D=일봉, W=주봉, M=월봉, Y=년봉"),
+):
+    """
+    여러 종목의 타임프레임별 캔들 데이터를 한 번에 조회 (워치리스트/검색 미리 불러오기용)
+    데이터가 없는 심볼은 결과에서 제외됨
+    """
+    # yf.download 는 티커를 대문자로 바꿔 돌려주므로 미리 대문자로 맞춤 (aapl / AAPL 캐시 중복도 방지)
+    syms = list(dict.fromkeys(s.strip().upper() for s in symbols.split(",") if s.strip()))
+    if not syms:
+        return {}
+    if len(syms) > BULK_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"심볼은 한 번에 최대 {BULK_MAX_SYMBOLS}개까지 조회할 수 있습니다.")
+
+    tf = _normalize_tf(tf)
+    result = await run_in_threadpool(_fetch_candles_bulk, syms, tf)
+    return ORJSONResponse(content=result, headers={"Cache-Control": _cache_control(tf)})
+
+
+@router.get("/{symbol}/ohlcv", response_model=None, responses={200: {"model": List[Candle]}})
 async def get_ohlcv(
         symbol: str,
         tf: str = Query("D", description="D=일봉, W=주봉, M=월봉, Y=년봉"),
@@ -193,6 +445,9 @@ async def get_ohlcv(
     타임프레임별 캔들 데이터
     프론트에서 들어오는 symbol은 이미 .KS / .KQ / US 심볼 등으로 변환되어 있다고 가정
     """
-    tf = (tf or "D").upper()
-    start, end, interval = _get_range_and_interval(tf)
-    return _fetch_candles_yfinance(symbol, start, end, interval, tf)
\ No newline at end of file
+    tf = _normalize_tf(tf)
+    # bulk 와 같은 캐시 키를 쓰도록 대문자로 정규화
+    symbol = symbol.strip().upper()
+    # yfinance 호출은 블로킹이므로 이벤트 루프를 막지 않도록 스레드풀에서 실행
+    candles = await run_in_threadpool(_fetch_candles_yfinance, symbol, tf)
+    return ORJSONResponse(content=candles, headers={"Cache-Control": _cache_control(tf)})
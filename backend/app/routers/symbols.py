@@ -1,5 +1,10 @@
+import asyncio
+
 import httpx
-from fastapi import APIRouter, HTTPException
+import orjson
+from cachetools import TTLCache
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import ORJSONResponse
 
 router = APIRouter(prefix="/symbols", tags=["Symbols"])
 
@@ -11,28 +16,49 @@ EXCHANGES = [
     ("KOSDAQ", "KQ"),
 ]
 
-@router.get("/")
+# 응답에 포함할 종목 type (ADR 등 추가 시 여기에만 넣으면 됨)
+TARGET_TYPES = frozenset({"Common Stock"})
+
+# 심볼 목록은 하루에 한 번 정도만 바뀌므로 메모리에 캐싱 (orjson 으로 직렬화한 응답 bytes 를 보관)
+_SYMBOLS_CACHE: TTLCache = TTLCache(maxsize=1, ttl=86400)
+
+
+@router.get("/", response_class=ORJSONResponse)
 async def get_all_symbols():
     """국내 + 미국 모든 티커 리스트 반환"""
-    all_symbols = []
+    cached = _SYMBOLS_CACHE.get("all")
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
 
-    async with httpx.AsyncClient() as client:
-        for label, code in EXCHANGES:
-            url = f"https://finnhub.io/api/v1/stock/symbol?exchange={code}&token={FINNHUB_KEY}"
+    urls = [
+        f"https://finnhub.io/api/v1/stock/symbol?exchange={code}&token={FINNHUB_KEY}"
+        for _, code in EXCHANGES
+    ]
+    # 세 거래소를 하나의 클라이언트(같은 커넥션 풀)로 동시에 요청 (한 곳이 실패해도 나머지 요청은 끝까지 기다린 뒤 처리)
+    # 결과는 하루 캐싱되므로 클라이언트는 요청 단위로 열고 닫음 (앱 lifespan 과 무관)
+    async with httpx.AsyncClient(timeout=30) as client:
+        responses = await asyncio.gather(*[client.get(url) for url in urls], return_exceptions=True)
 
-            resp = await client.get(url)
-            if resp.status_code != 200:
-                raise HTTPException(500, f"{label} 심볼 로드 실패")
+    all_symbols = []
+    for (label, _), resp in zip(EXCHANGES, responses):
+        if isinstance(resp, Exception) or resp.status_code != 200:
+            raise HTTPException(500, f"{label} 심볼 로드 실패")
 
-            data = resp.json()
+        # US 응답은 수십 MB 라 C 파서(orjson)로 bytes 를 바로 파싱
+        data = orjson.loads(resp.content)
 
-            # 필요한 필드만 리턴하도록 축소
-            for item in data:
-                if item.get("type") == "Common Stock":
-                    all_symbols.append({
-                        "symbol": item["symbol"],
-                        "description": item["description"],
-                        "exchange": label
-                    })
+        # 필요한 필드만 리턴하도록 축소
+        all_symbols.extend(
+            {
+                "symbol": item["symbol"],
+                "description": item["description"],
+                "exchange": label,
+            }
+            for item in data
+            if item.get("type") in TARGET_TYPES
+        )
 
-    return all_symbols
\ No newline at end of file
+    # 수만 건 리스트를 요청마다 다시 직렬화하지 않도록 한 번만 인코딩
+    body = orjson.dumps(all_symbols)
+    _SYMBOLS_CACHE["all"] = body
+    return Response(content=body, media_type="application/json")
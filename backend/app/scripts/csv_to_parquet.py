@@ -0,0 +1,28 @@
+# app/scripts/csv_to_parquet.py
+"""
+심볼 CSV → parquet 변환 (routers/stocks.py 가 parquet 이 있으면 우선 로딩)
+
+실행: backend/ 에서 `python -m app.scripts.csv_to_parquet`
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from app.scripts.symbols_common import DATA_DIR, write_parquet
+
+CSV_FILES = ["stocks_kr.csv", "stocks_us.csv"]
+
+
+def convert(csv_path: Path) -> Path | None:
+    df = pd.read_csv(csv_path, dtype={"symbol": str})
+
+    out_path = csv_path.with_suffix(".parquet")
+    if not write_parquet(df, out_path):
+        return None
+    print(f"[csv_to_parquet] {csv_path.name} {len(df)}행 → {out_path}")
+    return out_path
+
+
+if __name__ == "__main__":
+    for name in CSV_FILES:
+        convert(DATA_DIR / name)
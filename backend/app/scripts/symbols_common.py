@@ -0,0 +1,69 @@
+# app/scripts/symbols_common.py
+"""
+심볼 업데이트 스크립트 공용 헬퍼 (update_symbols.py / update_symbols_finnhub.py / csv_to_parquet.py)
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# app/ 디렉터리 기준 경로
+BASE_DIR = Path(__file__).resolve().parents[1]  # .../backend/app
+DATA_DIR = BASE_DIR / "data"
+
+
+def normalize_columns(df: pd.DataFrame, rename_map: dict[str, str]) -> pd.DataFrame:
+    """
+    rename_map(원본 컬럼명 → 표준 컬럼명 symbol/name/market)의 컬럼만 골라 표준 이름으로 rename
+    """
+    return df[list(rename_map)].rename(columns=rename_map)
+
+
+def strip_text_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # symbol/name 공백 정리 (여러 시장을 합친 뒤 한 번만 호출)
+    df[["symbol", "name"]] = df[["symbol", "name"]].astype("string").apply(lambda s: s.str.strip())
+    return df
+
+
+def concat_markets(frames: dict[str, pd.DataFrame], categories: list[str]) -> pd.DataFrame:
+    """
+    시장별 frame(symbol/name)을 컬럼 단위 np.concatenate 로 한 번에 합침
+    (pd.concat 의 인덱스 정렬/복사 없이 market 은 category 코드로 바로 생성)
+    """
+    lengths = [len(df) for df in frames.values()]
+    codes = np.repeat([categories.index(m) for m in frames], lengths)
+    return pd.DataFrame(
+        {
+            "symbol": np.concatenate([df["symbol"].to_numpy(dtype=object) for df in frames.values()]),
+            "name": np.concatenate([df["name"].to_numpy(dtype=object) for df in frames.values()]),
+            "market": pd.Categorical.from_codes(codes, categories=categories),
+        }
+    )
+
+
+def write_parquet(df: pd.DataFrame, out_path: Path) -> bool:
+    """
+    심볼 parquet 저장 (zstd). market 은 소수 값의 반복이므로 category → dictionary 인코딩
+    pyarrow 가 없으면 건너뛰고 False 반환 (routers/stocks.py 는 CSV 로 로딩)
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        print(f"[symbols] pyarrow 미설치 → parquet 저장 생략: {out_path}")
+        return False
+
+    if df["market"].dtype != "category":
+        df = df.assign(market=df["market"].astype("category"))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, out_path, compression="zstd")
+    return True
+
+
+def save_symbols(df: pd.DataFrame, csv_path: Path) -> None:
+    """
+    CSV(저장소 기준 파일) + 같은 이름의 parquet(routers/stocks.py 로딩용) 저장
+    parquet 을 CSV 보다 나중에 써야 "parquet 이 더 최신" 조건으로 로딩됨
+    """
+    df.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    write_parquet(df, csv_path.with_suffix(".parquet"))
@@ -1,27 +1,50 @@
 # backend/app/scripts/update_symbols.py
 
-from pathlib import Path
-
 import pandas as pd
 import FinanceDataReader as fdr
 
-# app/ 디렉터리 기준 경로
-BASE_DIR = Path(__file__).resolve().parents[1]  # .../backend/app
-DATA_DIR = BASE_DIR / "data"
+from app.scripts.symbols_common import (
+    DATA_DIR,
+    concat_markets,
+    normalize_columns,
+    save_symbols,
+    strip_text_columns,
+)
+
 DATA_DIR.mkdir(exist_ok=True)
 
+# FinanceDataReader 버전별 후보 컬럼명 (앞쪽이 우선)
+SYMBOL_CANDIDATES = ("Symbol", "symbol", "Code", "code")
+NAME_CANDIDATES = ("Name", "name")
+MARKET_CANDIDATES = ("Market", "market")
+
+# 표준 컬럼명 → 후보 컬럼명
+_COLUMN_CANDIDATES = {
+    "symbol": SYMBOL_CANDIDATES,
+    "name": NAME_CANDIDATES,
+    "market": MARKET_CANDIDATES,
+}
+
 
-def _pick_col(df: pd.DataFrame, candidates: list[str], label: str) -> str:
+def _pick_col(df: pd.DataFrame, candidates: tuple[str, ...], label: str) -> str:
     """
     DataFrame에서 candidates 중 존재하는 첫 컬럼명을 골라줌.
     (FinanceDataReader 버전에 따라 Code/Symbol, Name/name 등 컬럼명이 다를 수 있어서)
     """
-    for c in candidates:
-        if c in df.columns:
-            return c
+    columns = set(df.columns)
+    col = next((c for c in candidates if c in columns), None)
+    if col is not None:
+        return col
     raise KeyError(f"[update_symbols] {label} 컬럼을 찾을 수 없음. columns={df.columns.tolist()}")
 
 
+def _fdr_rename_map(df: pd.DataFrame, columns: list[str]) -> dict[str, str]:
+    """
+    columns(표준 컬럼명) → 이 DataFrame 에 실제로 있는 FDR 컬럼명 rename map
+    """
+    return {_pick_col(df, _COLUMN_CANDIDATES[col], col): col for col in columns}
+
+
 def update_kr_symbols():
     """
     한국 KRX 전체 상장 종목 (코스피 + 코스닥)
@@ -29,27 +52,12 @@ def update_kr_symbols():
     df = fdr.StockListing("KRX")
     print("[KRX columns]", df.columns.tolist())
 
-    code_col = _pick_col(df, ["Symbol", "symbol", "Code", "code"], "symbol")
-    name_col = _pick_col(df, ["Name", "name"], "name")
-    market_col = _pick_col(df, ["Market", "market"], "market")
-
-    df_norm = (
-        df[[code_col, name_col, market_col]]
-        .rename(
-            columns={
-                code_col: "symbol",
-                name_col: "name",
-                market_col: "market",
-            }
-        )
-        .copy()
-    )
-
-    df_norm["symbol"] = df_norm["symbol"].astype(str).str.strip()
-    df_norm["name"] = df_norm["name"].astype(str).str.strip()
+    df_norm = strip_text_columns(normalize_columns(df, _fdr_rename_map(df, ["symbol", "name", "market"])))
+    # KOSPI/KOSDAQ/KONEX 등 몇 개 값만 반복되므로 category 로 저장
+    df_norm["market"] = df_norm["market"].astype("category")
 
     out_path = DATA_DIR / "stocks_kr.csv"
-    df_norm.to_csv(out_path, index=False, encoding="utf-8-sig")
+    save_symbols(df_norm, out_path)
     print(f"[update_symbols] KRX 종목 {len(df_norm)}개 저장 → {out_path}")
 
 
@@ -58,32 +66,15 @@ def update_us_symbols():
     미국 상장 종목 (NASDAQ + NYSE + AMEX)
     """
     markets = ["NASDAQ", "NYSE", "AMEX"]
-    frames: list[pd.DataFrame] = []
+    frames: dict[str, pd.DataFrame] = {}
 
     for market in markets:
         try:
             df = fdr.StockListing(market)
             print(f"[US {market} columns]", df.columns.tolist())
 
-            code_col = _pick_col(df, ["Symbol", "symbol", "Code", "code"], "symbol")
-            name_col = _pick_col(df, ["Name", "name"], "name")
-
-            df_norm = (
-                df[[code_col, name_col]]
-                .rename(
-                    columns={
-                        code_col: "symbol",
-                        name_col: "name",
-                    }
-                )
-                .copy()
-            )
-            df_norm["symbol"] = df_norm["symbol"].astype(str).str.strip()
-            df_norm["name"] = df_norm["name"].astype(str).str.strip()
-            df_norm["market"] = market
-
-            frames.append(df_norm)
-            print(f"[update_symbols] {market} 종목 {len(df_norm)}개 로딩")
+            frames[market] = normalize_columns(df, _fdr_rename_map(df, ["symbol", "name"]))
+            print(f"[update_symbols] {market} 종목 {len(df)}개 로딩")
         except Exception as e:
             print(f"[update_symbols] {market} 로딩 실패:", e)
 
@@ -91,13 +82,13 @@ def update_us_symbols():
         df_us = pd.DataFrame(columns=["symbol", "name", "market"])
         print("[update_symbols] 미국 종목 로딩 실패, 빈 CSV 생성")
     else:
-        df_us = pd.concat(frames, ignore_index=True)
+        df_us = strip_text_columns(concat_markets(frames, markets))
 
     out_path = DATA_DIR / "stocks_us.csv"
-    df_us.to_csv(out_path, index=False, encoding="utf-8-sig")
+    save_symbols(df_us, out_path)
     print(f"[update_symbols] 미국 종목 {len(df_us)}개 저장 → {out_path}")
 
 
 if __name__ == "__main__":
     update_kr_symbols()
-    update_us_symbols()
\ No newline at end of file
+    update_us_symbols()
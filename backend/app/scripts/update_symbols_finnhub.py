@@ -1,16 +1,23 @@
 # app/scripts/update_symbols_finnhub.py
 import FinanceDataReader as fdr
-from pathlib import Path
 from typing import List, Dict
 
 import pandas as pd
 
+from app.scripts.symbols_common import (
+    DATA_DIR,
+    concat_markets,
+    normalize_columns,
+    save_symbols,
+    strip_text_columns,
+)
 from app.services.finnhub_client import get_symbols, FinnhubError
 
-BASE_DIR = Path(__file__).resolve().parents[1]  # .../backend/app
-DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(exist_ok=True)
 
+# Finnhub 응답 컬럼 → 표준 컬럼명
+_FINNHUB_COLUMNS = {"symbol": "symbol", "description": "name"}
+
 
 def build_us_symbols() -> pd.DataFrame:
     """
@@ -26,12 +33,8 @@ def build_us_symbols() -> pd.DataFrame:
     if "symbol" not in df.columns or "description" not in df.columns:
         raise RuntimeError(f"[symbols] US 응답 형식이 예상과 다릅니다: {df.columns.tolist()}")
 
-    df = df[["symbol", "description"]].rename(
-        columns={"description": "name"}
-    ).copy()
-    df["symbol"] = df["symbol"].astype(str).str.strip()
-    df["name"] = df["name"].astype(str).str.strip()
-    df["market"] = "US"
+    df = strip_text_columns(normalize_columns(df, _FINNHUB_COLUMNS))
+    df["market"] = pd.Categorical(["US"] * len(df), categories=["US"])
     print(f"[symbols] US 심볼 {len(df)}개")
     return df
 
@@ -44,7 +47,7 @@ def build_kr_symbols() -> pd.DataFrame:
     → 401 등으로 실패하면
     2순위: FinanceDataReader KRX 전체 상장 종목으로 fallback
     """
-    frames: List[pd.DataFrame] = []
+    frames: Dict[str, pd.DataFrame] = {}
     for ex, label in [("KS", "KS"), ("KQ", "KQ")]:
         try:
             print(f"[symbols] KR 심볼({ex}) 가져오는 중...")
@@ -54,14 +57,9 @@ def build_kr_symbols() -> pd.DataFrame:
                 print(f"[symbols] {ex} 응답 형식 이상: {df.columns.tolist()}")
                 continue
 
-            df = df[["symbol", "description"]].rename(
-                columns={"description": "name"}
-            ).copy()
-            df["symbol"] = df["symbol"].astype(str).str.strip()
-            df["name"] = df["name"].astype(str).str.strip()
-            df["market"] = label
+            df = normalize_columns(df, _FINNHUB_COLUMNS)
             print(f"[symbols] {ex} 심볼 {len(df)}개")
-            frames.append(df)
+            frames[label] = df
         except FinnhubError as e:
             print(f"[symbols] {ex} 로딩 실패(Finnhub): {e}")
 
@@ -75,35 +73,33 @@ def build_kr_symbols() -> pd.DataFrame:
         if "Code" not in df.columns or "Name" not in df.columns:
             raise RuntimeError(f"[symbols] FDR KRX 컬럼 예상과 다름: {df.columns.tolist()}")
 
-        df_norm = (
-            df[["Code", "Name", "Market"]]
-            .rename(columns={"Code": "symbol", "Name": "name", "Market": "market"})
-            .copy()
+        df_norm = strip_text_columns(
+            normalize_columns(df, {"Code": "symbol", "Name": "name", "Market": "market"})
         )
-
-        df_norm["symbol"] = df_norm["symbol"].astype(str).str.strip()
-        df_norm["name"] = df_norm["name"].astype(str).str.strip()
+        df_norm["market"] = df_norm["market"].astype("category")
 
         print(f"[symbols] FDR KRX 심볼 {len(df_norm)}개")
         return df_norm
 
-    # Finnhub KS/KQ를 일부라도 가져온 경우
-    return pd.concat(frames, ignore_index=True)
+    # Finnhub KS/KQ를 일부라도 가져온 경우 → 합친 뒤 한 번만 strip
+    return strip_text_columns(concat_markets(frames, ["KS", "KQ"]))
+
 
 def main():
     try:
+        # US / KS / KQ 세 번의 요청은 finnhub_client 공용 세션(keep-alive + 재시도)을 함께 사용
         df_us = build_us_symbols()
         df_kr = build_kr_symbols()
 
-        # CSV 저장
+        # parquet + CSV 저장
         us_path = DATA_DIR / "stocks_us.csv"
         kr_path = DATA_DIR / "stocks_kr.csv"
 
-        df_us.to_csv(us_path, index=False, encoding="utf-8-sig")
-        df_kr.to_csv(kr_path, index=False, encoding="utf-8-sig")
+        save_symbols(df_us, us_path)
+        save_symbols(df_kr, kr_path)
 
-        print(f"[symbols] 미국 종목 CSV 저장: {us_path} ({len(df_us)}개)")
-        print(f"[symbols] 한국 종목 CSV 저장: {kr_path} ({len(df_kr)}개)")
+        print(f"[symbols] 미국 종목 저장: {us_path.with_suffix('.parquet')} ({len(df_us)}개)")
+        print(f"[symbols] 한국 종목 저장: {kr_path.with_suffix('.parquet')} ({len(df_kr)}개)")
     except Exception as e:
         print("[symbols] 전체 업데이트 실패:", e)
 
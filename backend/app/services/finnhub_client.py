@@ -1,13 +1,33 @@
 # app/services/finnhub_client.py
 import os
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 BASE_URL = "https://finnhub.io/api/v1"
 
 
+# 모듈 공용 세션: keep-alive 로 TLS 연결 재사용 + 일시적 오류(429/5xx)는 짧게 재시도
+# (재시도를 다 쓰면 RetryError 대신 마지막 응답을 돌려받아 아래 raise_for_status 에서 FinnhubError 로 변환)
+_session = requests.Session()
+_session.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+            raise_on_status=False,
+        ),
+    ),
+)
+
+
 class FinnhubError(Exception):
     pass
 
@@ -26,7 +46,11 @@ def _get(path: str, params: Optional[Dict[str, Any]] = None) -> Any:
     params["token"] = FINNHUB_API_KEY
 
     url = f"{BASE_URL}{path}"
-    resp = requests.get(url, params=params, timeout=10)
+    try:
+        resp = _session.get(url, params=params, timeout=10)
+    except requests.RequestException as e:
+        # 연결 실패/타임아웃(재시도 소진 포함)도 호출부에서 FinnhubError 하나로 처리하도록 변환
+        raise FinnhubError(f"Finnhub 요청 실패: {url} - {e}") from e
     try:
         resp.raise_for_status()
     except requests.HTTPError as e:
@@ -45,4 +69,12 @@ def get_candles(symbol: str, resolution: str, from_ts: int, to_ts: int) -> Dict[
     return _get(
         "/stock/candle",
         {"symbol": symbol, "resolution": resolution, "from": from_ts, "to": to_ts},
-    )
\ No newline at end of file
+    )
+
+
+def get_symbols(exchange: str) -> List[Dict[str, Any]]:
+    """
+    Finnhub 거래소별 상장 심볼 목록
+    exchange: 'US', 'KS', 'KQ' ...
+    """
+    return _get("/stock/symbol", {"exchange": exchange})
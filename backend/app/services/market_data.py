@@ -0,0 +1,118 @@
+# app/services/market_data.py
+import logging
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Dict, List
+
+import pandas as pd
+import yfinance as yf
+from cachetools import TTLCache
+from curl_cffi import requests as curl_requests
+
+logger = logging.getLogger(__name__)
+
+# 받아 둘 일봉 이력 길이 (년봉 30년치까지 한 번에 커버)
+HISTORY_SPAN = timedelta(days=365 * 30)
+
+# 긴 이력은 과거 봉이 바뀔 일이 거의 없으므로 TTL 길게 (배당/분할 수정주가 반영 주기)
+HISTORY_TTL = 6 * 3600
+
+# 최근 구간만 짧은 TTL 로 다시 받아 긴 이력 뒤에 덮어씀 (장중 봉 갱신)
+TAIL_SPAN = timedelta(days=14)
+TAIL_TTL = 60
+
+# yf.download 한 번에 묶어 보낼 최대 심볼 수
+BULK_CHUNK_SIZE = 20
+
+# yf.download 는 session 을 안 넘기면 호출마다 새 세션을 만들므로(yfinance 1.x) 모듈 공용 세션을 넘겨
+# Yahoo 커넥션(TLS)과 쿠키/crumb 를 재사용. yfinance 기본값과 같은 curl_cffi chrome impersonate 세션
+_YF_SESSION = curl_requests.Session(impersonate="chrome")
+
+# 심볼별 일봉 캐시: 30년치 이력(긴 TTL) / 최근 TAIL_SPAN 구간(짧은 TTL)
+_HISTORY_CACHE = TTLCache(maxsize=256, ttl=HISTORY_TTL)
+_TAIL_CACHE = TTLCache(maxsize=256, ttl=TAIL_TTL)
+_cache_lock = Lock()
+
+
+class MarketDataError(Exception):
+    pass
+
+
+def _download(symbols: List[str], start: datetime) -> Dict[str, pd.DataFrame]:
+    """
+    start 이후 일봉을 yf.download 한 번에 최대 20개씩 가져옴 → 심볼별 DataFrame dict (데이터 없는 심볼은 제외)
+    end 는 지정하지 않음: yfinance 의 end 는 미포함이라 오늘(장중) 봉이 빠짐
+    """
+    result: Dict[str, pd.DataFrame] = {}
+    for i in range(0, len(symbols), BULK_CHUNK_SIZE):
+        chunk = symbols[i:i + BULK_CHUNK_SIZE]
+        try:
+            logger.debug("yfinance download: %s, %s~, interval=1d", chunk, start.date())
+            raw = yf.download(
+                tickers=" ".join(chunk),
+                start=start.date(),
+                interval="1d",
+                group_by="ticker",
+                auto_adjust=True,
+                actions=False,
+                threads=True,
+                progress=False,
+                session=_YF_SESSION,
+            )
+        except Exception as e:
+            raise MarketDataError(f"yfinance download 오류: {chunk} - {e}") from e
+
+        if raw is None or raw.empty:
+            continue
+
+        for sym in chunk:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if sym not in raw.columns.get_level_values(0):
+                    continue
+                df = raw.xs(sym, axis=1, level=0)
+            else:
+                df = raw
+            # 여러 종목을 묶어 받으면 날짜가 합집합으로 정렬되므로, 해당 종목 데이터가 없는 행 제거
+            df = df.dropna(how="all")
+            if not df.empty:
+                result[sym] = df
+
+    return result
+
+
+def _merge_tail(history: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    # 최근 구간은 새로 받은 tail 로 교체 (tail 이 곧 전체 이력이면 그대로)
+    if tail is history or tail.empty:
+        return history
+    return pd.concat([history[history.index < tail.index[0]], tail])
+
+
+def get_histories(symbols: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    일봉 이력 조회 → 심볼별 DataFrame dict 반환 (데이터 없는 심볼은 제외)
+    30년치 이력은 HISTORY_TTL 동안 재사용하고, TAIL_TTL 마다는 최근 TAIL_SPAN 구간만 다시 받아 합침
+    """
+    with _cache_lock:
+        histories = {sym: _HISTORY_CACHE[sym] for sym in symbols if sym in _HISTORY_CACHE}
+        tails = {sym: _TAIL_CACHE[sym] for sym in symbols if sym in _TAIL_CACHE}
+
+    now = datetime.utcnow()
+
+    # 1) 이력이 없는 심볼: 30년치 전체 (오늘 봉까지 포함되므로 tail 로도 그대로 사용)
+    need_history = [sym for sym in symbols if sym not in histories]
+    if need_history:
+        fetched = _download(need_history, now - HISTORY_SPAN)
+        with _cache_lock:
+            for sym, df in fetched.items():
+                histories[sym] = tails[sym] = _HISTORY_CACHE[sym] = _TAIL_CACHE[sym] = df
+
+    # 2) 이력은 있고 tail 만 만료된 심볼: 최근 구간만 (수천 행 대신 ~10행)
+    need_tail = [sym for sym in symbols if sym in histories and sym not in tails]
+    if need_tail:
+        fetched = _download(need_tail, now - TAIL_SPAN)
+        with _cache_lock:
+            for sym in need_tail:
+                # 최근 구간이 비어 있으면(장기 휴장 등) 이력만 사용
+                tails[sym] = _TAIL_CACHE[sym] = fetched.get(sym, histories[sym])
+
+    return {sym: _merge_tail(histories[sym], tails[sym]) for sym in symbols if sym in histories}